@@ -194,7 +194,8 @@ class WAV2SRT(Base_Component):  # Must inherit from base class.
         if self.server_mode and current_audio_path:
             db_list = [(f'{current_audio}.wav', current_audio_path)]
         elif not self.server_mode:
-            db_list += [(i, os.path.join(OUT_DIR_DEFAULT, i)) for i in os.listdir(OUT_DIR_DEFAULT) if i.endswith('.wav')]
+            with os.scandir(OUT_DIR_DEFAULT) as it:  # entry.path is already joined, no stat per entry
+                db_list += [(x.name, x.path) for x in it if x.name.endswith('.wav')]
         return (
             gr.update(choices=vid_list, value=vid_list[-1][1]),
             gr.update(choices=sub_list, value=sub_list[-1][1]),
@@ -9,6 +9,8 @@ from . import *
 
 
 LANGUAGE_map = {"中文": "zh-CHS", "English": "en", "日本語": "ja", "한국어": "ko", "Français": "fr"}
+# reuse the TLS connection to openapi.youdao.com across batches.
+session = requests.Session()
 
 
 # 修改自官方示例
@@ -66,7 +68,7 @@ class Youdao(Traducteur):
             data = {'q': text, 'from': 'auto', 'to': LANGUAGE_map[target_lang]}
             addAuthParams(self.app_key, self.app_secret, data)
             try:
-                response = requests.post('https://openapi.youdao.com/api', data, header)
+                response = session.post('https://openapi.youdao.com/api', data=data, headers=header)
                 response.raise_for_status()
                 result = json.loads(response.content)
                 print(result)
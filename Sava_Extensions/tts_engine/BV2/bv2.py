@@ -1,9 +1,30 @@
 import requests
+from requests.adapters import HTTPAdapter
 import gradio as gr
 import os
 import time
+from typing import NamedTuple
 from . import *
 
+# keep-alive connections to the local HiyoriUI API are shared by all synthesis threads.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_maxsize=32))
+session.trust_env = False  # requests to 127.0.0.1 should never go through a proxy
+
+
+class BV2Args(NamedTuple):
+    # filtered arguments produced by BV2.arg_filter, still a plain tuple so save() can splat it.
+    language: str
+    port: int
+    mid: int
+    spkid: int
+    speaker_name: str
+    sdp_ratio: float
+    noise_scale: float
+    noise_scale_w: float
+    length_scale: float
+    emo_text: str
+
 
 class BV2(TTSProjet):  # Must inherit from base class.
     def __init__(self):
@@ -32,18 +53,18 @@ class BV2(TTSProjet):  # Must inherit from base class.
         start_hiyoriui_btn.click(start_hiyoriui)
 
     def arg_filter(self, *args):
-        # actually defining this method is not necessarily here.
+        # coerce and pick speaker name/id once per job, save_action runs for every subtitle line.
         language, port, mid, spkid, speaker_name, sdp_ratio, noise_scale, noise_scale_w, length_scale, emo_text = args
-        pargs = (language, port, mid, spkid, speaker_name, sdp_ratio, noise_scale, noise_scale_w, length_scale, emo_text)
-        return pargs
-
-    def save_action(self, *args, text: str = None):
-        language, port, mid, sid, speaker_name, sdp_ratio, noise_scale, noise_scale_w, length_scale, emotion_text = args
-        sid, port, mid = utils.positive_int(sid, port, mid)
+        spkid, port, mid = utils.positive_int(spkid, port, mid)
         if speaker_name is not None and speaker_name != "":
-            audio = self.api(text=text, mid=mid, spk_name=speaker_name, sid=None, lang=language, length=length_scale, noise=noise_scale, noisew=noise_scale_w, sdp=sdp_ratio, split=False, style_text=None, style_weight=0, port=port, emotion=emotion_text)
+            spkid = None
         else:
-            audio = self.api(text=text, mid=mid, spk_name=None, sid=sid, lang=language, length=length_scale, noise=noise_scale, noisew=noise_scale_w, sdp=sdp_ratio, split=False, style_text=None, style_weight=0, port=port, emotion=emotion_text)
+            speaker_name = None
+        return BV2Args(language, port, mid, spkid, speaker_name, sdp_ratio, noise_scale, noise_scale_w, length_scale, emo_text)
+
+    def save_action(self, *args, text: str = None):
+        a = BV2Args._make(args)
+        audio = self.api(text=text, mid=a.mid, spk_name=a.speaker_name, sid=a.spkid, lang=a.language, length=a.length_scale, noise=a.noise_scale, noisew=a.noise_scale_w, sdp=a.sdp_ratio, split=False, style_text=None, style_weight=0, port=a.port, emotion=a.emo_text)
         return audio
 
     def api(self, text, mid, spk_name, sid, lang, length, noise, noisew, sdp, emotion, split, style_text, style_weight, port):
@@ -51,7 +72,7 @@ class BV2(TTSProjet):  # Must inherit from base class.
             API_URL = f'http://127.0.0.1:{port}/voice'
             data_json = {"model_id": mid, "speaker_name": spk_name, "speaker_id": sid, "language": lang, "length": length, "noise": noise, "noisew": noisew, "sdp_ratio": sdp, "emotion": emotion, "auto_translate": False, "auto_split": split, "style_text": style_text, "style_weight": style_weight, "text": text}
             # print(data_json)
-            response = requests.get(url=API_URL, params=data_json)
+            response = session.get(url=API_URL, params=data_json)
             response.raise_for_status()
             return response.content
         except Exception as e:
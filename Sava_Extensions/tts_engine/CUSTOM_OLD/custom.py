@@ -1,16 +1,13 @@
-import requests
 import gradio as gr
 import time
 import os
 from . import *
 
-current_path = os.environ.get("current_path")
-
 
 class Custom(TTSProjet):  # Must inherit from base class.
     def __init__(self):
         self.custom_api_list = []
-        self.refresh_custom_api_list()
+        self.refresh_custom_api_list(delay=False)
         super().__init__("custom", title=i18n('Custom API'))
 
     def api(self, func, text):
@@ -44,18 +41,20 @@ class Custom(TTSProjet):  # Must inherit from base class.
     def save_action(self, custom_api_path, temp_namesp, text):
         return self.api(temp_namesp["custom_api"], text)
 
-    def refresh_custom_api_list(self):
+    def refresh_custom_api_list(self, delay=True):
         self.custom_api_list = ['None']
         try:
             preset_dir = os.path.join(current_path, "SAVAdata", "presets")
-            if os.path.isdir(preset_dir):
-                self.custom_api_list += [i for i in os.listdir(preset_dir) if i.endswith(".py")]
-            else:
-                logger.info(i18n('No custom API code file found.'))
+            # a missing presets folder surfaces from scandir itself, no isdir stat first.
+            with os.scandir(preset_dir) as it:
+                self.custom_api_list += [x.name for x in it if x.name.endswith(".py") and x.is_file()]
+        except FileNotFoundError:
+            logger.info(i18n('No custom API code file found.'))
         except Exception as e:
             self.custom_api_list = ['None']
             err = f"Error: {e}"
             logger.error(err)
             gr.Warning(err)
-        time.sleep(0.1)
+        if delay:  # only the button needs the pause, construction at startup does not
+            time.sleep(0.1)
         return gr.update(value="None", choices=self.custom_api_list)
@@ -46,17 +46,19 @@ except ImportError:
 from .i18nAuto import I18n
 
 ext_tab_path = os.path.join(current_path, "Sava_Extensions/extensions_config.json")
-if os.path.exists(ext_tab_path):
-    ext_tab = defaultdict(dict, json.load(open(ext_tab_path, encoding="utf-8")))
-else:
+try:
+    with open(ext_tab_path, encoding="utf-8") as f:
+        ext_tab = defaultdict(dict, json.load(f))
+except FileNotFoundError:
     ext_tab = defaultdict(dict)
 
 config_path = os.path.join(current_path, "SAVAdata", "config.json")
 try:
-    if os.path.isfile(config_path):
-        x = json.load(open(config_path, encoding="utf-8"))
+    try:
+        with open(config_path, encoding="utf-8") as f:
+            x = json.load(f)
         i18n = I18n(x.get("language"))
-    else:
+    except FileNotFoundError:
         x = dict()
         i18n = I18n()
     from .settings import Settings
@@ -1,6 +1,7 @@
 import numpy as np
 import soundfile as sf
 import soxr
+import struct
 
 # obtained form librosa
 
@@ -68,29 +69,14 @@ def get_rms(
 ):
     padding = (int(frame_length // 2), int(frame_length // 2))
     y = np.pad(y, padding, mode=pad_mode)
+    # running sum of squares, the power of a frame is the difference of two entries.
+    # no (frame_length, n_frames) window matrix is materialised.
+    cumsum = np.cumsum(np.square(y, dtype=np.float64), axis=-1)
+    cumsum = np.concatenate([np.zeros(cumsum.shape[:-1] + (1,)), cumsum], axis=-1)
+    starts = np.arange(0, y.shape[-1] - frame_length + 1, hop_length)
+    power = (cumsum[..., starts + frame_length] - cumsum[..., starts]) / frame_length
 
-    axis = -1
-    # put our new within-frame axis at the end for now
-    out_strides = y.strides + tuple([y.strides[axis]])
-    # Reduce the shape on the framing axis
-    x_shape_trimmed = list(y.shape)
-    x_shape_trimmed[axis] -= frame_length - 1
-    out_shape = tuple(x_shape_trimmed) + tuple([frame_length])
-    xw = np.lib.stride_tricks.as_strided(y, shape=out_shape, strides=out_strides)
-    if axis < 0:
-        target_axis = axis - 1
-    else:
-        target_axis = axis + 1
-    xw = np.moveaxis(xw, -1, target_axis)
-    # Downsample along the target axis
-    slices = [slice(None)] * xw.ndim
-    slices[axis] = slice(0, None, hop_length)
-    x = xw[tuple(slices)]
-
-    # Calculate power
-    power = np.mean(np.abs(x) ** 2, axis=-2, keepdims=True)
-
-    return np.sqrt(power)
+    return np.sqrt(power)[..., np.newaxis, :]
 
 
 def remove_opening_silence(audio, sr, padding_begin=0.1, padding_fin=0.2, threshold_db=-27):
@@ -98,12 +84,13 @@ def remove_opening_silence(audio, sr, padding_begin=0.1, padding_fin=0.2, thresh
     hop_length = 512
     rms_list = get_rms(audio, hop_length=hop_length).squeeze(0)
     threshold = 10 ** (threshold_db / 20.0)
-    for i, rms in enumerate(rms_list):
-        if rms >= threshold:
-            break
-    for j, rms in enumerate(reversed(rms_list)):
-        if rms >= threshold:
-            break
+    # first loud frame from each end in one vectorised pass, same indices the per-frame loops stopped at
+    loud = rms_list >= threshold
+    i = int(np.argmax(loud))
+    if loud[i]:
+        j = int(np.argmax(loud[::-1]))
+    else:  # nothing loud, argmax fell back to frame 0
+        i = j = rms_list.shape[-1] - 1
     cutting_point1 = max(i * hop_length - int(padding_begin * sr), 0)
     cutting_point2 = min((rms_list.shape[-1] - j) * hop_length + int(padding_fin * sr), audio.shape[-1])
     audio = audio[cutting_point1:cutting_point2]
@@ -111,10 +98,37 @@ def remove_opening_silence(audio, sr, padding_begin=0.1, padding_fin=0.2, thresh
 
 
 def load_audio(filepath, sr=None):
-    y, sr_native = sf.read(filepath)
+    # float32 is plenty for 16/24-bit sources and halves the memory traffic of every later pass.
+    y, sr_native = sf.read(filepath, dtype="float32")
     y = to_mono(y)
     if sr != sr_native and sr not in [None, 0]:
         y = resample(y, orig_sr=sr_native, target_sr=sr)
         return y, sr
     else:
         return y, sr_native
+
+
+def pcm16_to_wav(pcm: bytes, sr: int) -> bytes:
+    # mono 16-bit PCM, the canonical 44-byte header is all the wave module would write.
+    header = struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1, sr, sr * 2, 2, 16, b"data", len(pcm))
+    return header + pcm
+
+
+def read_pcm16_mono(wav: bytes):
+    # (int16 samples, sr) for plain 16-bit mono PCM wavs, None for anything else so the caller can fall back to soundfile.
+    fmt = None
+    pos = 12
+    try:
+        while pos + 8 <= len(wav):
+            chunk_id, size = struct.unpack_from("<4sI", wav, pos)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack_from("<HHIIHH", wav, pos + 8)  # format tag, channels, sr, byte rate, block align, bits
+            elif chunk_id == b"data":
+                if fmt is None or fmt[0] != 1 or fmt[1] != 1 or fmt[5] != 16:
+                    return None
+                data = memoryview(wav)[pos + 8 : pos + 8 + size]  # streamed responses may declare a larger size than they carry
+                return np.frombuffer(data, dtype="<i2", count=len(data) // 2), fmt[2]
+            pos += 8 + size + (size & 1)
+    except struct.error:
+        pass
+    return None
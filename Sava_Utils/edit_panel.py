@@ -2,6 +2,7 @@ import gradio as gr
 import os
 import pickle
 import re
+import time
 from . import i18n
 from itertools import islice
 from .subtitle import Subtitles, Subtitle
@@ -9,6 +10,23 @@ from .tts_engines import TTS_UI_LOADER
 import Sava_Utils
 
 current_path = os.environ.get("current_path")
+# path -> (st_mtime_ns, names). adding, removing or renaming an entry bumps the directory mtime.
+LISTDIR_CACHE: dict[str, tuple[int, list[str]]] = {}
+# FAT/exFAT keep mtimes in 2s ticks, an entry added in the same tick as a scan would not change the key.
+LISTDIR_MTIME_TICK_NS = 2_000_000_000
+
+
+def cached_listdir(path: str, refresh=False) -> list[str]:
+    mtime = os.stat(path).st_mtime_ns
+    cached = None if refresh else LISTDIR_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, os.listdir(path))
+        # only keep listings whose mtime tick is already over, the refresh buttons always list again.
+        if time.time_ns() - mtime > LISTDIR_MTIME_TICK_NS:
+            LISTDIR_CACHE[path] = cached
+        else:
+            LISTDIR_CACHE.pop(path, None)
+    return list(cached[1])
 
 
 def load_page(subtitle_list, target_index=1):
@@ -86,17 +104,17 @@ def play_audio(idx, subtitle_list: Subtitles):
             return None
 
 
-def refworklist():
+def refworklist(refresh=False):
     try:
         assert not Sava_Utils.config.server_mode
-        return os.listdir(os.path.join(current_path, "SAVAdata", "workspaces"))
+        return cached_listdir(os.path.join(current_path, "SAVAdata", "workspaces"), refresh)
     except:
         return []
 
 
-def getworklist(value=None):
+def getworklist(value=None, refresh=False):
     if not Sava_Utils.config.server_mode:
-        workspaces_list_choices = refworklist()
+        workspaces_list_choices = refworklist(refresh)
         c = workspaces_list_choices if len(workspaces_list_choices) > 0 else [""]
         return gr.update(choices=c, value=value if value else c[-1])
     else:
@@ -104,15 +122,15 @@ def getworklist(value=None):
         return gr.update(choices=c, value=c[0])
 
 
-def refspklist():
+def refspklist(refresh=False):
     try:
-        return ["None", *os.listdir(os.path.join(current_path, "SAVAdata", "speakers"))]
+        return ["None", *cached_listdir(os.path.join(current_path, "SAVAdata", "speakers"), refresh)]
     except:
         return ["None"]
 
 
-def getspklist(value="None"):
-    speaker_list_choices = refspklist()
+def getspklist(value="None", refresh=False):
+    speaker_list_choices = refspklist(refresh)
     return gr.update(choices=speaker_list_choices, value=value if len(speaker_list_choices) > 1 else "None")
 
 
@@ -165,11 +183,17 @@ def merge_subtitle(page, subtitles: Subtitles, *args):
         min_i = min(targetlist)
         subtitles[min_i].end_time_raw = subtitles[max_i].end_time_raw
         subtitles[min_i].end_time = subtitles[max_i].end_time
-        for i in range(min_i, max_i):
-            if subtitles[min_i].text[-1] not in [" ", "\n", "!", ".", "?", "。", "！", "？"]:
-                subtitles[min_i].text += ','
-            subtitles[min_i].text += subtitles[min_i + 1].text
-            subtitles.pop(min_i + 1)
+        # join the texts once and drop the merged lines with one slice delete, not a list shift per line.
+        parts = [subtitles[min_i].text]
+        tail = parts[0][-1]
+        for i in range(min_i + 1, max_i + 1):
+            if tail not in [" ", "\n", "!", ".", "?", "。", "！", "？"]:
+                parts.append(',')
+                tail = ','
+            parts.append(subtitles[i].text)
+            tail = parts[-1][-1:] or tail
+        subtitles[min_i].text = "".join(parts)
+        del subtitles[min_i + 1 : max_i + 1]
         subtitles[min_i].is_success = None
     else:
         gr.Info(i18n('Please select both the start and end points!'))
@@ -317,7 +341,7 @@ def find_and_replace(subtitles: Subtitles, find_text_expression: str, target_tex
                 item.text, count = pat.subn(target_text, item.text)
                 if count != 0:
                     item.is_success = None
-                    replaced.insert(0, item.index)
+                    replaced.append(item.index)
                     if exec_code and not Sava_Utils.config.server_mode:
                         exec(exec_code)
         except Exception as e:
@@ -331,12 +355,13 @@ def find_and_replace(subtitles: Subtitles, find_text_expression: str, target_tex
             if item.text != x:
                 item.text = x
                 item.is_success = None
-                replaced.insert(0, item.index)
+                replaced.append(item.index)
                 try:
                     if exec_code and not Sava_Utils.config.server_mode:
                         exec(exec_code)
                 except Exception as e:
                     gr.Warning(f"Error: {str(e)}")
                     return load_page(subtitles, page_index)
+    replaced.reverse()  # collected back to front, append + one reverse instead of insert(0) per hit
     gr.Info(f"Found and replaced {len(replaced)} subtitle(s).\n{replaced}")
     return load_page(subtitles, page_index)
@@ -6,9 +6,13 @@ help_custom = r"""
 ### Place code files containing Python functions in the SAVAdata/presets directory, and they will be callable.
 * Here is an example code for Gradio API.
 ```
+from gradio_client import Client
+client = None
+
 def custom_api(text): #return: audio content
-    from gradio_client import Client
-    client = Client("http://127.0.0.1:7860/")
+    global client
+    if client is None: # connecting fetches the API info, do it once instead of for every subtitle
+        client = Client("http://127.0.0.1:7860/")
     result = client.predict(
 		text,	# str  in '输入文本内容' Textbox component
 		"神里绫华",	# str (Option from: [('神里绫华', '神里绫华')]) in 'Speaker' Dropdown component
@@ -5,9 +5,13 @@ help_custom = r"""
 
 ### 将装有python函数的代码文件放在`SAVAdata/presets`下即可被调用  
 ```
+from gradio_client import Client
+client = None
+
 def custom_api(text):#return: audio content
-    from gradio_client import Client
-    client = Client("http://127.0.0.1:7860/")
+    global client
+    if client is None: # 连接时会拉取API信息，只连接一次，不要每条字幕都连接
+        client = Client("http://127.0.0.1:7860/")
     result = client.predict(
 		text,	# str  in '输入文本内容' Textbox component
 		"神里绫华",	# str (Option from: [('神里绫华', '神里绫华')]) in 'Speaker' Dropdown component
@@ -12,10 +12,39 @@ import numpy as np
 from collections import defaultdict
 from . import logger, i18n
 
+try:
+    import orjson  # installed with gradio
+except ImportError:
+    orjson = None
+
 
 current_path = os.environ.get("current_path")
 
 
+def load_json(path: str):
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump_json(obj, path: str):
+    # same layout as json.dump(indent=2, ensure_ascii=False), orjson writes utf-8 bytes directly.
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return  # saving again without edits, leave the file and its mtime alone
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 EXT_TYPES = ["tts_engine", "translator", "extension"]
 EXT_TYPES_TITLE = {
     "tts_engine": i18n("TTS Engine"),
@@ -110,8 +139,7 @@ class Settings:
     def save(self):
         dic = self.to_dict()
         os.makedirs(os.path.join(current_path, "SAVAdata"), exist_ok=True)
-        with open(os.path.join(current_path, "SAVAdata", "config.json"), "w", encoding="utf-8") as f:
-            json.dump(dic, f, indent=2, ensure_ascii=False)
+        dump_json(dic, os.path.join(current_path, "SAVAdata", "config.json"))
 
     @classmethod
     def from_dict(cls, dict):
@@ -120,14 +148,14 @@ class Settings:
 
 def load_cfg():
     config_path = os.path.join(current_path, "SAVAdata", "config.json")
-    if os.path.exists(config_path):
-        try:
-            config = Settings.from_dict(json.load(open(config_path, encoding="utf-8")))
-        except Exception as e:
-            config = Settings()
-            logger.warning(f"Failed to load settings, reset to default: {e}")
-    else:
+    # open directly and treat a missing file as defaults, no separate exists() stat
+    try:
+        config = Settings.from_dict(load_json(config_path))
+    except FileNotFoundError:
         config = Settings()
+    except Exception as e:
+        config = Settings()
+        logger.warning(f"Failed to load settings, reset to default: {e}")
     return config
 
 
@@ -269,21 +297,24 @@ class Settings_Manager:
         gr.Info(i18n('Settings saved successfully!'))
         return all_vals
 
-    def get_ext_tab(self):
+    def get_ext_tab(self, ext_config=None):
         rows = []
         comp_dict = {
             "tts_engine": [i.dirname for i in self.components[1].values() if hasattr(i, "dirname")],
             "translator": [i.dirname for i in self.components[2]["translation_module"].TRANSLATORS.values() if hasattr(i, "dirname")],
             "extension": [i.dirname for i in self.components[3].values() if hasattr(i, "dirname")],
         }
-        config_path = os.path.join(current_path, "Sava_Extensions/extensions_config.json")
-        if os.path.isfile(os.path.join(current_path, "Sava_Extensions/extensions_config.json")):
-            ext_config = defaultdict(dict, json.load(open(config_path, encoding="utf-8")))
-        else:
-            ext_config = defaultdict(dict)
+        if ext_config is None:
+            config_path = os.path.join(current_path, "Sava_Extensions/extensions_config.json")
+            try:
+                ext_config = defaultdict(dict, load_json(config_path))
+            except FileNotFoundError:
+                ext_config = defaultdict(dict)
         for ext_type in EXT_TYPES:
             os.makedirs(os.path.join(current_path, "Sava_Extensions", ext_type), exist_ok=True)
-            for i in [x for x in os.listdir(os.path.join(current_path, "Sava_Extensions", ext_type)) if os.path.isdir(os.path.join(current_path, "Sava_Extensions", ext_type, x))]:
+            with os.scandir(os.path.join(current_path, "Sava_Extensions", ext_type)) as it:  # d_type from readdir, no stat per entry
+                dirs = [x.name for x in it if x.is_dir()]
+            for i in dirs:
                 rows.append([i, EXT_TYPES_TITLE[ext_type], i18n('Running') if i in comp_dict[ext_type] else "", ext_config[ext_type].get(i, True)])
         return np.array(rows)
 
@@ -291,9 +322,9 @@ class Settings_Manager:
         cfg = defaultdict(dict)
         for i in tab:
             cfg[EXT_TYPES_TITLE_REV.get(i[1], "extension")][i[0]] = True if i[-1] in [True, 'True', 'true'] else False  # gradio bug
-        with open(os.path.join(current_path, "Sava_Extensions/extensions_config.json"), "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2, ensure_ascii=False)
-        return self.get_ext_tab()
+        dump_json(cfg, os.path.join(current_path, "Sava_Extensions/extensions_config.json"))
+        # the table is rebuilt from what was just written, no need to read the file back.
+        return self.get_ext_tab(cfg)
 
     def getUI(self):
         if not self.ui:
@@ -8,12 +8,15 @@ import pickle
 import shutil
 import Sava_Utils
 import copy
+from concurrent.futures import ThreadPoolExecutor
 from . import logger, i18n
 from .audio_utils import load_audio
 
 current_path = os.environ.get("current_path")
 MAX_TIMESTAMP = 18000
 SRT_TIME_Pattern = re.compile(r"\d+:\d+:\d+,\d+")
+# libsndfile decoding and soxr resampling release the GIL, a few threads keep audio_join off a single core.
+JOIN_WORKERS = min(8, os.cpu_count() or 1)
 
 
 def compare_index_lt(i1, i2):
@@ -26,6 +29,14 @@ def compare_index_lt(i1, i2):
     return l1 < l2
 
 
+def index_key(index: str):
+    # sort key equivalent to compare_index_lt: trailing zeros are dropped so "1" and "1-0" still tie.
+    key = list(map(int, index.split("-")))
+    while len(key) > 1 and key[-1] == 0:
+        key.pop()
+    return tuple(key)
+
+
 def to_time(time_raw: float):
     hours, r = divmod(time_raw, 3600)
     minutes, r = divmod(r, 60)
@@ -154,42 +165,46 @@ class Subtitles:
     def get_abs_dir(self):
         return os.path.join(current_path, "SAVAdata", "workspaces", self.dir)
 
-    def audio_join(self, sr=None):  # -> tuple[int,np.array]
+    def audio_join(self, sr=None):  # -> str, path of the joined wav
         assert self.dir is not None
         abs_path = self.get_abs_dir()
         audiolist = []
         delayed_list = []
         failed_list = []
-        fl = [i for i in os.listdir(abs_path) if i.endswith(".wav")]
+        # one directory scan answers every per-line existence check below.
+        fl = {i for i in os.listdir(abs_path) if i.endswith(".wav")}
         if len(fl) == 0:
             gr.Warning(i18n('Subtitles have not been synthesized yet!'))
             return None
         if sr in [None, 0]:
-            wav, sr = load_audio(os.path.join(abs_path, fl[0]), sr=sr)
+            sr = sf.info(os.path.join(abs_path, next(iter(fl)))).samplerate  # header only, no decode
         self.sr = sr
         interval = int(Sava_Utils.config.min_interval * sr)
-        del fl
+
+        def load(name):
+            if name in fl:
+                return load_audio(os.path.join(abs_path, name), sr=sr)[0]
+            return None
+
+        with ThreadPoolExecutor(max_workers=JOIN_WORKERS) as executor:
+            wavs = list(executor.map(load, [f"{i.index}.wav" for i in self.subtitles]))
         ptr = 0
         for id, i in enumerate(self.subtitles):
             start_frame = int(i.start_time * sr)
             if ptr <= start_frame:
-                silence_len = start_frame - ptr
-                audiolist.append(np.zeros(silence_len))
-                ptr += silence_len
+                ptr = start_frame
                 self.subtitles[id].is_delayed = False
             elif start_frame != 0 and ptr > start_frame:
                 self.subtitles[id].is_delayed = True
                 delayed_list.append(self.subtitles[id].index)
-            f_path = os.path.join(abs_path, f"{i.index}.wav")
-            if os.path.exists(f_path):
-                wav, sr = load_audio(f_path, sr=sr)
+            wav = wavs[id]
+            if wav is not None:
                 dur = wav.shape[-1]  # frames
                 self.subtitles[id].real_st = ptr
+                audiolist.append((ptr, wav))
                 ptr += dur
-                audiolist.append(wav)
                 self.subtitles[id].real_et = ptr
                 ptr += interval
-                audiolist.append(np.zeros(interval))
                 # self.subtitles[id].is_success = True
             else:
                 failed_list.append(self.subtitles[id].index)
@@ -199,10 +214,16 @@ class Subtitles:
         if failed_list != []:
             logger.warning(f"{i18n('Failed to synthesize the following subtitles or they were not synthesized')}:{failed_list}")
             gr.Warning(f"{i18n('Failed to synthesize the following subtitles or they were not synthesized')}:{failed_list}")
-        audio_content = np.concatenate(audiolist)
+        # gaps and intervals are the zero-initialised parts of one buffer, no per-gap arrays and no final concatenate copy.
+        audio_content = np.zeros(ptr, dtype=np.float32)
+        for start, wav in audiolist:
+            audio_content[start : start + wav.shape[-1]] = wav
+        del audiolist, wavs
         self.dump()
-        sf.write(os.path.join(current_path, "SAVAdata", "output", f"{self.dir}.wav"), audio_content, sr)
-        return sr, audio_content
+        output_path = os.path.join(current_path, "SAVAdata", "output", f"{self.dir}.wav")
+        sf.write(output_path, audio_content, sr)
+        # hand gr.Audio the file we just wrote, returning (sr, array) made gradio encode the whole dub again.
+        return output_path
 
     def get_state(self, idx):
         if self.subtitles[idx].is_success:
@@ -217,12 +238,13 @@ class Subtitles:
         self.subtitles.append(subtitle)
 
     def sort(self, begin=0, end=0, partial=False):
+        # parse every index once instead of twice per comparison in __lt__
         if not partial:
-            self.subtitles.sort()
+            self.subtitles.sort(key=lambda x: index_key(x.index))
         else:
             if end > len(self.subtitles):
                 end = len(self.subtitles)
-            self.subtitles[begin:end] = sorted(self.subtitles[begin:end])
+            self.subtitles[begin:end] = sorted(self.subtitles[begin:end], key=lambda x: index_key(x.index))
 
     def __iter__(self):
         return iter(self.subtitles)
@@ -230,6 +252,9 @@ class Subtitles:
     def __getitem__(self, index):
         return self.subtitles[index]
 
+    def __delitem__(self, index):
+        del self.subtitles[index]
+
     def pop(self, index):
         self.subtitles.pop(index)
 
@@ -162,5 +162,7 @@ class Translation_module(Base_Component):
                                 traceback.print_exc()
                     stop_btn = gr.Button(value=i18n('Stop'), variant="stop")
                     stop_btn.click(lambda x: gr.Info(x.set()), inputs=[self.INTERRUPT_EVENT])
-                self.translator.change(lambda x: [gr.update(visible=x == i) for i in self.TRANSLATORS.keys()], inputs=[self.translator], outputs=self.menu)
+                # one prebuilt visibility list per translator, like BTN_VISIBLE_DICT. No value in them, so sharing is safe.
+                menu_visible = {x: [gr.update(visible=x == i) for i in self.TRANSLATORS.keys()] for x in self.TRANSLATORS.keys()}
+                self.translator.change(lambda x: menu_visible[x], inputs=[self.translator], outputs=self.menu)
             self.merge_btn.click(merge_uploaded_sub, inputs=[self.merge_upload1, self.merge_upload2, self.output_dir], outputs=[self.translation_output, self.output_info])
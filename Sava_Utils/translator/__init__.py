@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from ..base_component import Base_Component
 import re
 
+NEWLINES_PATTERN = re.compile(r'\n+')
+
 
 class Traducteur(Base_Component):
     def __init__(self, name, config=None):
@@ -23,13 +25,8 @@ class Traducteur(Base_Component):
         The returned value will look like:
             [['Hello!', '你好!'], ['Bonjour!']]
         """
-        tasks: list[list[str]] = [[]]
-        for idx, item in enumerate(subtitles):
-            tasks[-1].append(re.sub(r'\n+', '\n', item.text).strip())
-            if (idx + 1) % batch_size == 0:
-                tasks.append([])
-        if len(tasks[-1]) == 0:
-            tasks.pop(-1)
+        texts = [NEWLINES_PATTERN.sub('\n', item.text).strip() for item in subtitles]
+        tasks: list[list[str]] = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
         return tasks
 
     @abstractmethod
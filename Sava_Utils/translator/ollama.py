@@ -9,6 +9,10 @@ from ..utils import rc_open_window,rc_bg
 from .. import logger, i18n
 from tqdm import tqdm
 
+# one keep-alive connection for the whole translation job instead of a new one per batch.
+session = requests.Session()
+THINK_PATTERN = re.compile(r'<think>.*?</think>', flags=re.DOTALL)
+
 
 class Ollama(Traducteur):
     def __init__(self):
@@ -29,7 +33,7 @@ class Ollama(Traducteur):
                 return gr.update(choices=self.models, value=self.models[0] if len(self.models) != 0 else None)
             if url in [None, "", "Default"]:
                 url = self.ollama_url
-            response = requests.get(f'{url}/api/tags')
+            response = session.get(f'{url}/api/tags')
             response.raise_for_status()
             self.models.clear()
             for item in json.loads(response.content)["models"]:
@@ -70,11 +74,11 @@ class Ollama(Traducteur):
                 prompt = f"Please translate the following content into {target_lang}. Strictly preserve the original paragraph structure. Do not include any additional comments or explanations---return only the translated text:\n{text}"
             data = {"role": "user", "content": prompt}
             request_data["messages"].append(data)
-            response = requests.post(url=f'{url}/api/chat', json=request_data)
+            response = session.post(url=f'{url}/api/chat', json=request_data)
             response.raise_for_status()
             response_dict = json.loads(response.content)["message"]
             # print(response_dict["content"])
-            result = re.sub(r'<think>.*?</think>', '', response_dict["content"], flags=re.DOTALL).strip()
+            result = THINK_PATTERN.sub('', response_dict["content"]).strip()
 
             request_data["messages"].append(response_dict)
             if len(request_data["messages"]) > 2 * num_history:
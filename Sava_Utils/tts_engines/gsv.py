@@ -5,14 +5,19 @@ from ..utils import positive_int,rc_open_window
 from .. import logger
 from .. import i18n
 from ..settings import Shared_Option, Settings
+from ..audio_utils import pcm16_to_wav
 import os
 import hashlib
+import numpy as np
 import soundfile as sf
 import time
 import json
-import wave
 import shutil
-import io
+import functools
+from typing import NamedTuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import NewConnectionError
 
 current_path = os.environ.get("current_path")
 
@@ -43,13 +48,35 @@ except:
         "Slice by English punct": "cut4",
         "Slice by every punct": "cut5",
     }
+# keep-alive connections to the local API servers are shared by all synthesis threads.
+session = requests.Session()
+# only failures where the request never reached the API are retried, with exponential backoff 0.5s, 1s, 2s:
+# refused connections for every endpoint, 502/503/504 only for the GET endpoints, the synthesis POST is never repeated.
+# read=False re-raises read errors and timeouts as ReadTimeout/ConnectionError right away, a synthesis may already be running.
+# urllib3 logs every retry at warning level, other errors go back to the caller unchanged.
+RETRY = Retry(total=3, connect=3, read=False, status=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), raise_on_status=False)
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=RETRY))
+session.trust_env = False  # requests to 127.0.0.1 should never go through a proxy
+# fail fast when nothing is listening on the port, but let long syntheses and model loads finish.
+API_TIMEOUT = (10, 7200)  # (connect, read) seconds
+# port -> time.monotonic() deadline, set when a port refuses connections (or times out connecting) even after retrying.
+unreachable_ports: dict[int, float] = {}
+UNREACHABLE_PORT_TTL = 5.0
+
+# resolved once, a dead API fails every subtitle line through the same error path.
+API_ERROR_PREFIX = i18n('An error has occurred. Please check if the API is running correctly. Details')
+API_RETURNED_MESSAGE = i18n('Returned Message')
+# dropdown choices are fixed once the language pack is loaded.
+LANGUAGE_CHOICES = list(dict_language.items())
+CUT_METHOD_CHOICES = list(cut_method.items())
 # dict_language_rev = {val: key for key, val in dict_language.items()}
 # cut_method_rev={val:key for key,val in cut_method.items()}
 
 
 def temp_ra(a: tuple):
     sr, wav = a
-    name = hashlib.md5(wav.tobytes()).hexdigest() + ".wav"
+    # hash the array buffer in place, same digest as wav.tobytes() without copying the whole clip.
+    name = hashlib.md5(np.ascontiguousarray(wav)).hexdigest() + ".wav"
     os.makedirs(os.path.join(current_path, "SAVAdata", "temp"), exist_ok=True)
     dir = os.path.join(current_path, "SAVAdata", "temp", name)
     if not os.path.exists(dir):
@@ -82,13 +109,85 @@ S1_PRETRAINED = [
 ]
 
 
+# the integrated package layout is fixed for the lifetime of the process, detect it once at import.
+_bundled_python = os.path.join(current_path, "runtime\\python.exe")
+BUNDLED_GSV_PYDIR = _bundled_python if "GPT" in current_path.upper() and os.path.isfile(_bundled_python) else ""
+
+
+def find_pretrained_models(gsv_dir: str):
+    # not cached: this backs the refresh button, so models downloaded after startup must show up.
+    s2 = tuple(m for m in (os.path.join(gsv_dir, item) for item in S2_PRETRAINED) if os.path.exists(m))
+    s1 = tuple(m for m in (os.path.join(gsv_dir, item) for item in S1_PRETRAINED) if os.path.exists(m))
+    return s2, s1
+
+
+def list_models(gsv_dir: str, subdirs: list, ext: str) -> list:
+    # missing weight folders are normal for older GSV versions, let scandir report them instead of an isdir stat first.
+    models = []
+    for item in subdirs:
+        try:
+            with os.scandir(os.path.join(gsv_dir, item)) as it:
+                models += [x.path for x in it if x.name.endswith(ext) and x.is_file()]
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+    return models
+
+
+def is_connect_failure(e: Exception) -> bool:
+    # read timeouts and dropped connections are ConnectionErrors too, but the server is alive, only cache real connect failures.
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(e.args[0], "reason", None) if isinstance(e, requests.ConnectionError) and e.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+@functools.lru_cache(maxsize=8)
+def read_prompt_wav(path: str, version: tuple) -> bytes:
+    # the same prompt is uploaded for every subtitle line; version is (st_mtime_ns, st_size) so edited files are re-read.
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=32)
+def read_preset_info(path: str, version: tuple) -> dict:
+    # load_preset runs on every dropdown change, version is (st_mtime_ns, st_size) so a re-saved preset gets a new key
+    # even when the filesystem only keeps coarse mtimes.
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ARTTSArgs(NamedTuple):
+    # filtered arguments produced by GSV.arg_filter, still a plain tuple so save() can splat it.
+    artts_proj: str
+    text_language: str
+    port: int
+    refer_wav_path: str
+    aux_refer_wav_path: list
+    prompt_text: str
+    prompt_language: str
+    batch_size: int
+    batch_threshold: float
+    fragment_interval: float
+    speed_factor: float
+    top_k: int
+    top_p: float
+    temperature: float
+    repetition_penalty: float
+    sample_steps: int
+    parallel_infer: bool
+    split_bucket: bool
+    text_split_method: str
+    gpt_path: str
+    sovits_path: str
+
+
 class GSV(TTSProjet):
     def __init__(self):
         self.gsv_fallback = False
         self.presets_list = ['None']
         self.current_sovits_model = dict()
         self.current_gpt_model = dict()
-        self.refresh_presets_list()
+        self.refresh_presets_list(delay=False)
         super().__init__("AR-TTS", title="AR-TTS")
 
     def update_cfg(self, config: Settings):
@@ -119,6 +218,10 @@ class GSV(TTSProjet):
         start_gsv_btn.click(start_gsv)
 
     def api(self, port, artts_name, **kwargs):
+        if unreachable_ports.get(port, 0) > time.monotonic():
+            # no connection could be made just now even after all retries, fail the remaining lines fast.
+            logger.error(f"{API_ERROR_PREFIX}: 127.0.0.1:{port} could not be connected to, skipped as unreachable.")
+            return None
         try:
             if artts_name == "GPT_SoVITS":
                 data_json = kwargs
@@ -140,90 +243,62 @@ class GSV(TTSProjet):
                     }
                     API_URL = f"http://127.0.0.1:{port}/"
                 # print(data_json)
-                response = requests.post(url=API_URL, json=data_json)
+                response = session.post(url=API_URL, json=data_json, timeout=API_TIMEOUT)
                 response.raise_for_status()
                 return response.content
             else:
                 # cosy2
                 files = None
+                data_json = {"tts_text": kwargs["text"], "speed": kwargs["speed_factor"]}
                 if kwargs["ref_audio_path"] == '':
-                    print("使用预训练音色模式...")
-                    data_json = {
-                        "spk_id": kwargs["prompt_text"],
-                        "tts_text": kwargs["text"],
-                        "speed": kwargs["speed_factor"],
-                    }
+                    logger.debug("使用预训练音色模式...")
+                    data_json["spk_id"] = kwargs["prompt_text"]
                     API_URL = f"http://127.0.0.1:{port}/inference_sft"
                 else:
-                    print("使用3s克隆模式...")
-                    data_json = {"prompt_text": kwargs["prompt_text"], "tts_text": kwargs["text"], "speed": kwargs["speed_factor"]}
+                    logger.debug("使用3s克隆模式...")
+                    data_json["prompt_text"] = kwargs["prompt_text"]
                     API_URL = f"http://127.0.0.1:{port}/inference_zero_shot"
-                    files = [('prompt_wav', ('prompt_wav', open(kwargs["ref_audio_path"], 'rb'), 'application/octet-stream'))]
-                response = requests.request("GET", url=API_URL, data=data_json, files=files, stream=False)
+                    st = os.stat(kwargs["ref_audio_path"])
+                    prompt_wav = read_prompt_wav(kwargs["ref_audio_path"], (st.st_mtime_ns, st.st_size))
+                    files = [('prompt_wav', ('prompt_wav', prompt_wav, 'application/octet-stream'))]
+                response = session.request("GET", url=API_URL, data=data_json, files=files, stream=False, timeout=API_TIMEOUT)
                 response.raise_for_status()
-                wav_buffer = io.BytesIO()
-                with wave.open(wav_buffer, "wb") as wav_file:
-                    wav_file.setnchannels(1)
-                    wav_file.setsampwidth(2)
-                    wav_file.setframerate(24000)  # cosy api does not provide sr.
-                    wav_file.writeframes(response.content)
-                return wav_buffer.getvalue()
+                return pcm16_to_wav(response.content, 24000)  # cosy api does not provide sr.
         except Exception as e:
-            err = f"{i18n('An error has occurred. Please check if the API is running correctly. Details')}: {e}  "
+            if is_connect_failure(e):
+                unreachable_ports[port] = time.monotonic() + UNREACHABLE_PORT_TTL
+            err = f"{API_ERROR_PREFIX}: {e}  "
             try:
-                err += f"{i18n('Returned Message')}:{response.json()}"
+                err += f"{API_RETURNED_MESSAGE}:{response.json()}"
             except:
                 pass
             logger.error(err)
             return None
 
     def save_action(self, *args, text: str = None):
-        (
-            artts_proj,
-            text_language,
-            port,
-            refer_wav_path,
-            aux_refer_wav_path,
-            prompt_text,
-            prompt_language,
-            batch_size,
-            batch_threshold,
-            fragment_interval,
-            speed_factor,
-            top_k,
-            top_p,
-            temperature,
-            repetition_penalty,
-            sample_steps,
-            parallel_infer,
-            split_bucket,
-            text_split_method,
-            gpt_path,
-            sovits_path,
-        ) = args
-        port = positive_int(port)
+        a = ARTTSArgs._make(args)
         audio = self.api(
-            port,
-            artts_name=artts_proj,
+            a.port,
+            artts_name=a.artts_proj,
             text=text,
-            text_lang=text_language,  ###language->lang
-            ref_audio_path=refer_wav_path,  # ref
-            aux_ref_audio_paths=aux_refer_wav_path,
-            prompt_text=prompt_text,
-            prompt_lang=prompt_language,  #
-            batch_size=batch_size,
-            batch_threshold=batch_threshold,
-            fragment_interval=fragment_interval,
-            speed_factor=speed_factor,
-            top_k=top_k,
-            top_p=top_p,
+            text_lang=a.text_language,  ###language->lang
+            ref_audio_path=a.refer_wav_path,  # ref
+            aux_ref_audio_paths=a.aux_refer_wav_path,
+            prompt_text=a.prompt_text,
+            prompt_lang=a.prompt_language,  #
+            batch_size=a.batch_size,
+            batch_threshold=a.batch_threshold,
+            fragment_interval=a.fragment_interval,
+            speed_factor=a.speed_factor,
+            top_k=a.top_k,
+            top_p=a.top_p,
             seed=-1,
-            temperature=temperature,
-            repetition_penalty=repetition_penalty,
-            parallel_infer=parallel_infer,
-            split_bucket=split_bucket,
-            text_split_method=text_split_method,
-            sample_steps=sample_steps,
+            temperature=a.temperature,
+            repetition_penalty=a.repetition_penalty,
+            parallel_infer=a.parallel_infer,
+            split_bucket=a.split_bucket,
+            text_split_method=a.text_split_method,
+            sample_steps=a.sample_steps,
             media_type="wav",
             streaming_mode=False,
         )
@@ -232,13 +307,13 @@ class GSV(TTSProjet):
     def _UI(self):
         with gr.Column():
             self.choose_ar_tts = gr.Radio(label=i18n('Select TTS Project'), choices=["GPT_SoVITS", "CosyVoice2"], value="GPT_SoVITS", interactive=not self.server_mode)
-            self.language2 = gr.Dropdown(choices=list(dict_language.items()), value=list(dict_language.values())[5], label=i18n('Inference text language'), interactive=True, allow_custom_value=False)
+            self.language2 = gr.Dropdown(choices=LANGUAGE_CHOICES, value=LANGUAGE_CHOICES[5][1], label=i18n('Inference text language'), interactive=True, allow_custom_value=False)
             with gr.Accordion(i18n('Reference Audio'), open=True):
                 self.refer_audio = gr.Audio(label=i18n('Main Reference Audio'))
                 self.aux_ref_audio = gr.File(label=i18n('Auxiliary Reference Audios'), file_types=['.wav'], file_count="multiple", type="binary")
                 with gr.Row():
                     self.refer_text = gr.Textbox(label=i18n('Transcription of Main Reference Audio'), value="", placeholder=i18n('Transcription | Pretrained Speaker (Cosy)'))
-                    self.refer_lang = gr.Dropdown(choices=list(dict_language.items()), value=list(dict_language.values())[-2], label=i18n('Language of Main Reference Audio'), interactive=True, allow_custom_value=False)
+                    self.refer_lang = gr.Dropdown(choices=LANGUAGE_CHOICES, value=LANGUAGE_CHOICES[-2][1], label=i18n('Language of Main Reference Audio'), interactive=True, allow_custom_value=False)
             with gr.Accordion(i18n('Switch Models'), open=False, visible=not self.server_mode):
                 self.sovits_path = gr.Dropdown(value="", label=f"Sovits {i18n('Model Path')}", interactive=True, allow_custom_value=True, choices=[''])
                 self.gpt_path = gr.Dropdown(value="", label=f"GPT {i18n('Model Path')}", interactive=True, allow_custom_value=True, choices=[''])
@@ -262,7 +337,7 @@ class GSV(TTSProjet):
                 with gr.Row():
                     self.parallel_infer = gr.Checkbox(label="Parallel_Infer", value=True, interactive=True, show_label=True)
                     self.split_bucket = gr.Checkbox(label="Split_Bucket", value=True, interactive=True, show_label=True)
-                self.how_to_cut = gr.Radio(label=i18n('How to cut'), choices=list(cut_method.items()), value=list(cut_method.values())[0], interactive=True)
+                self.how_to_cut = gr.Radio(label=i18n('How to cut'), choices=CUT_METHOD_CHOICES, value=CUT_METHOD_CHOICES[0][1], interactive=True)
             with gr.Accordion(i18n('Presets'), open=False):
                 self.choose_presets = gr.Dropdown(label="", value="None", choices=self.presets_list, interactive=True, allow_custom_value=True)
                 self.desc_presets = gr.Textbox(label="", placeholder=i18n('(Optional) Description'), interactive=True)
@@ -327,12 +402,9 @@ class GSV(TTSProjet):
                 else:
                     gr.Warning(f"{i18n('Error, Invalid Path')}:{gsv_pydir}")
                     gsv_pydir = ""
-            else:
-                if os.path.isfile(os.path.join(current_path, "runtime\\python.exe")) and "GPT" in current_path.upper():
-                    gsv_pydir = os.path.join(current_path, "runtime\\python.exe")
-                    logger.info(f"{i18n('Env detected')}: GPT-SoVITS")
-                else:
-                    gsv_pydir = ""
+            elif BUNDLED_GSV_PYDIR:
+                gsv_pydir = BUNDLED_GSV_PYDIR
+                logger.info(f"{i18n('Env detected')}: GPT-SoVITS")
             ###################
             if gsv_pydir != "" and config.query("gsv_dir", "") == "":
                 config.shared_opts["gsv_dir"] = os.path.dirname(os.path.dirname(gsv_pydir))
@@ -388,15 +460,40 @@ class GSV(TTSProjet):
             refer_audio_path = temp_ra(refer_audio)
         else:
             refer_audio_path = ''
-        aux_ref_audio_path = [temp_aux_ra(i) for i in aux_ref_audio] if aux_ref_audio is not None else []
-        pargs = (artts_proj, dict_language.get(language, language), port, refer_audio_path, aux_ref_audio_path, refer_text, dict_language.get(refer_lang, refer_lang), batch_size, batch_threshold, fragment_interval, speed_factor, top_k, top_p, temperature, repetition_penalty, int(sample_steps), parallel_infer, split_bucket, cut_method.get(text_split_method, text_split_method), gpt_path, sovits_path)
+        # only GPT-SoVITS consumes auxiliary references; skip hashing and writing them for CosyVoice2.
+        aux_ref_audio_path = [temp_aux_ra(i) for i in aux_ref_audio] if aux_ref_audio is not None and artts_proj == "GPT_SoVITS" else []
+        # coerce once per job here, save_action runs for every subtitle line with these values.
+        pargs = ARTTSArgs(
+            artts_proj,
+            dict_language.get(language, language),
+            positive_int(port),
+            refer_audio_path,
+            aux_ref_audio_path,
+            refer_text,
+            dict_language.get(refer_lang, refer_lang),
+            int(batch_size),
+            float(batch_threshold),
+            float(fragment_interval),
+            float(speed_factor),
+            positive_int(top_k),
+            float(top_p),
+            float(temperature),
+            float(repetition_penalty),
+            int(sample_steps),
+            parallel_infer,
+            split_bucket,
+            cut_method.get(text_split_method, text_split_method),
+            gpt_path,
+            sovits_path,
+        )
         return pargs
 
     def before_gen_action(self, *args, **kwargs):
-        if args[0] == 'GPT_SoVITS':
+        a = ARTTSArgs._make(args)
+        if a.artts_proj == 'GPT_SoVITS':
             force = kwargs.get("force", True)
             notify = kwargs.get("notify", False)
-            self.switch_gsvmodel(gpt_path=args[-2], sovits_path=args[-1], port=args[2], force=force, notify=notify)
+            self.switch_gsvmodel(gpt_path=a.gpt_path, sovits_path=a.sovits_path, port=a.port, force=force, notify=notify)
 
     def save_preset(self, name, artts_name, description, port, ra, ara, rt, rl, sovits_path, gpt_path):
         try:
@@ -415,11 +512,18 @@ class GSV(TTSProjet):
 
     def load_preset(self, name):
         try:
-            if name in ['None', None, "", []] or not os.path.exists(os.path.join(current_path, "SAVAdata", "presets", name)):
+            version = None
+            if name not in ['None', None, "", []]:
+                info_path = os.path.join(current_path, "SAVAdata", "presets", name, "info.json")
+                try:
+                    st = os.stat(info_path)  # one stat answers both "does it exist" and "which cached parse is current"
+                    version = (st.st_mtime_ns, st.st_size)
+                except FileNotFoundError:
+                    pass
+            if version is None:
                 return gr.update(), gr.update(label="", value="", placeholder=i18n('(Optional) Description'), interactive=True), gr.update(), gr.update(), gr.update(), gr.update(), gr.update(), gr.update(), gr.update(), gr.update()
 
-            dir = os.path.join(current_path, "SAVAdata", "presets", name)
-            preset = ARPreset.from_dict(json.load(open(os.path.join(dir, "info.json"), encoding="utf-8")))
+            preset = ARPreset.from_dict(read_preset_info(info_path, version))
 
             if preset.AR_TTS_Project_name == 'GPT_SoVITS' and preset.sovits_path != "" and preset.gpt_path != "":
                 if not self.switch_gsvmodel(sovits_path=preset.sovits_path, gpt_path=preset.gpt_path, port=preset.port, force=False):
@@ -462,14 +566,14 @@ class GSV(TTSProjet):
             port = int(port)
             if self.gsv_fallback:
                 API_URL = f'http://127.0.0.1:{port}/set_model/'
-                response = requests.post(url=API_URL, json=data_json)
+                response = session.post(url=API_URL, json=data_json, timeout=API_TIMEOUT)
                 response.raise_for_status()
             else:
                 API_URL = f'http://127.0.0.1:{port}/set_gpt_weights'
-                response = requests.get(url=API_URL, params={"weights_path": data_json["gpt_model_path"]})
+                response = session.get(url=API_URL, params={"weights_path": data_json["gpt_model_path"]}, timeout=API_TIMEOUT)
                 response.raise_for_status()
                 API_URL = f'http://127.0.0.1:{port}/set_sovits_weights'
-                response = requests.get(url=API_URL, params={"weights_path": data_json["sovits_model_path"]})
+                response = session.get(url=API_URL, params={"weights_path": data_json["sovits_model_path"]}, timeout=API_TIMEOUT)
                 response.raise_for_status()
             self.current_sovits_model[port] = sovits_path
             self.current_gpt_model[port] = gpt_path
@@ -490,24 +594,11 @@ class GSV(TTSProjet):
         if self.gsv_dir in ["", None] or not os.path.isdir(self.gsv_dir):
             gr.Warning(i18n('GSV root path has been not configured or does not exist.'))
             return gr.update(choices=['']), gr.update(choices=[''])
-        s1 = ['']
-        s2 = ['']
-        for item in S2_PRETRAINED:
-            m = os.path.join(self.gsv_dir, item)
-            if os.path.exists(m):
-                s2.append(m)
-        for item in S2_MODEL_PATH:
-            cd = os.path.join(self.gsv_dir, item)
-            if os.path.isdir(cd):
-                s2 += [os.path.join(self.gsv_dir, item, i) for i in os.listdir(cd) if i.endswith(".pth")]
-        for item in S1_PRETRAINED:
-            m = os.path.join(self.gsv_dir, item)
-            if os.path.exists(m):
-                s1.append(m)
-        for item in S1_MODEL_PATH:
-            cd = os.path.join(self.gsv_dir, item)
-            if os.path.isdir(cd):
-                s1 += [os.path.join(self.gsv_dir, item, i) for i in os.listdir(cd) if i.endswith(".ckpt")]
+        s2_pretrained, s1_pretrained = find_pretrained_models(self.gsv_dir)
+        s1 = ['', *s1_pretrained]
+        s2 = ['', *s2_pretrained]
+        s2 += list_models(self.gsv_dir, S2_MODEL_PATH, ".pth")
+        s1 += list_models(self.gsv_dir, S1_MODEL_PATH, ".ckpt")
         return gr.update(choices=s2), gr.update(choices=s1)
 
     def del_preset(self, name):
@@ -523,12 +614,13 @@ class GSV(TTSProjet):
             gr.Warning(f"Error: {str(e)}")
         return self.refresh_presets_list()
 
-    def refresh_presets_list(self, reset=True):
+    def refresh_presets_list(self, reset=True, delay=True):
         self.presets_list = ['None']
         try:
             preset_dir = os.path.join(current_path, "SAVAdata", "presets")
             if os.path.isdir(preset_dir):
-                self.presets_list += [i for i in os.listdir(preset_dir) if os.path.isdir(os.path.join(preset_dir, i))]
+                with os.scandir(preset_dir) as it:
+                    self.presets_list += [i.name for i in it if i.is_dir()]
             else:
                 logger.info(i18n('No preset available'))
                 gr.Info(i18n('No preset available'))
@@ -537,7 +629,8 @@ class GSV(TTSProjet):
             err = f"Error: {e}"
             logger.error(err)
             gr.Warning(err)
-        time.sleep(0.1)
+        if delay:  # only the button needs the pause, construction at startup does not
+            time.sleep(0.1)
         if reset:
             return gr.update(value="None", choices=self.presets_list)
         else:
@@ -4,11 +4,16 @@ import os
 import re
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import gradio as gr
 from .. import logger, i18n
 from xml.etree import ElementTree
 
 current_path = os.environ.get("current_path")
+# reuse TLS connections to the Azure endpoint instead of a new handshake for every subtitle line.
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=32))
+LANG_OPTION_PATTERN = re.compile(r'(?<=[,，])| ')
 SERVER_Regions = [
     'southafricanorth',
     'eastasia',
@@ -43,9 +48,19 @@ SERVER_Regions = [
 ]
 
 
+def synthesis_headers(token: str) -> dict:
+    return {
+        "X-Microsoft-OutputFormat": "riff-48khz-16bit-mono-pcm",
+        "Content-Type": "application/ssml+xml",
+        "Authorization": "Bearer " + token,
+        "User-Agent": "py_sava",
+    }
+
+
 class MSTTS(TTSProjet):
     def __init__(self):
         self.ms_access_token = ""
+        self.ms_headers = synthesis_headers(self.ms_access_token)
         self.ms_speaker_info = {}
         self.cfg_ms_region = ""
         self.cfg_ms_key = ""
@@ -93,12 +108,13 @@ class MSTTS(TTSProjet):
         return options
 
     def getms_speakers(self):
+        dataraw = None
         if not os.path.exists(os.path.join(current_path, "SAVAdata", "ms_speaker_info_raw.json")):
             try:
                 assert self.cfg_ms_key not in [None, ""], i18n('Please fill in your key to get MSTTS speaker list.')
                 headers = {"Ocp-Apim-Subscription-Key": self.cfg_ms_key}
                 url = f"https://{self.cfg_ms_region}.tts.speech.microsoft.com/cognitiveservices/voices/list"
-                data = requests.get(url=url, headers=headers)
+                data = session.get(url=url, headers=headers)
                 data.raise_for_status()
                 info = json.loads(data.content)
                 with open(
@@ -107,15 +123,18 @@ class MSTTS(TTSProjet):
                     encoding="utf-8",
                 ) as f:
                     json.dump(info, f, indent=2, ensure_ascii=False)
+                dataraw = info
             except Exception as e:
                 err = f"{i18n('Can not get speaker list of MSTTS. Details')}: {e}"
                 gr.Warning(err)
                 logger.error(err)
                 self.ms_speaker_info = {}
                 return None
-        dataraw = json.load(open(os.path.join(current_path, "SAVAdata", "ms_speaker_info_raw.json"), encoding="utf-8"))  # list
+        if dataraw is None:
+            with open(os.path.join(current_path, "SAVAdata", "ms_speaker_info_raw.json"), encoding="utf-8") as f:
+                dataraw = json.load(f)  # list
         classified_info = {}
-        target_language = re.split(r'(?<=[,，])| ', self.ms_lang_option)
+        target_language = LANG_OPTION_PATTERN.split(self.ms_lang_option)
         target_language = [x.strip() for x in target_language if x.strip()]
         if len(target_language) == 0:
             target_language = [""]
@@ -126,15 +145,18 @@ class MSTTS(TTSProjet):
                 classified_info[i["Locale"]][i["LocalName"]] = i
         with open(os.path.join("SAVAdata", "ms_speaker_info.json"), "w", encoding="utf-8") as f:
             json.dump(classified_info, f, indent=2, ensure_ascii=False)
-        self.ms_speaker_info = json.load(open(os.path.join("SAVAdata", "ms_speaker_info.json"), encoding="utf-8"))
+        # keep the map we just built, reading the file back would only return the same dict.
+        self.ms_speaker_info = classified_info
 
     def getms_token(self):
         fetch_token_url = f"https://{self.cfg_ms_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken"
         headers = {"Ocp-Apim-Subscription-Key": self.cfg_ms_key}
         try:
-            response = requests.post(fetch_token_url, headers=headers)
+            response = session.post(fetch_token_url, headers=headers)
             response.raise_for_status()
             self.ms_access_token = str(response.text)
+            # built once per token, api() sends the same headers for every subtitle line.
+            self.ms_headers = synthesis_headers(self.ms_access_token)
         except Exception as e:
             err = f"{i18n('Failed to obtain access token from Microsoft. Check your API key, server status, and network connection. Details')}: {e}"
             gr.Warning(err)
@@ -160,15 +182,9 @@ class MSTTS(TTSProjet):
             if self.ms_access_token is None:
                 self.getms_token()
                 assert self.ms_access_token is not None, i18n('Failed to obtain access token from Microsoft.')
-            headers = {
-                "X-Microsoft-OutputFormat": "riff-48khz-16bit-mono-pcm",
-                "Content-Type": "application/ssml+xml",
-                "Authorization": "Bearer " + self.ms_access_token,
-                "User-Agent": "py_sava",
-            }
-            response = requests.post(
+            response = session.post(
                 url=f"https://{self.cfg_ms_region}.tts.speech.microsoft.com/cognitiveservices/v1",
-                headers=headers,
+                headers=self.ms_headers,
                 data=body,
             )
             response.raise_for_status()
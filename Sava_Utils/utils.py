@@ -15,6 +15,8 @@ import Sava_Utils
 current_path = os.environ.get("current_path")
 system = platform.system()
 LABELED_TXT_PATTERN = re.compile(r'^([^:：]{1,20})[:：](.+)')
+SRT_INDEX_PATTERN = re.compile(r"\d+")
+TXT_SENTENCE_PATTERN = re.compile(r"(?<=[!?。！？])(?=[^!?。！？（）()[\]【】'\"“”]|$)|\n|(?<=[.])(?=\s|$)")
 
 
 class Flag:
@@ -133,24 +135,23 @@ def read_srt(filename, offset):
         subtitle_list = Subtitles()
         indexlist = []
         filelength = len(file)
-        pattern = re.compile(r"\d+")
         for i in range(0, filelength):
             if " --> " in file[i]:
-                if pattern.fullmatch(file[i - 1].strip().replace("\ufeff", "")):
+                if SRT_INDEX_PATTERN.fullmatch(file[i - 1].strip().replace("\ufeff", "")):
                     indexlist.append(i)  # get line id
         listlength = len(indexlist)
         id = 1
         for i in range(0, listlength - 1):
             st, et = file[indexlist[i]].split(" --> ")
             # id = int(file[indexlist[i] - 1].strip().replace("\ufeff", ""))
-            text = "".join(file[x] for x in range(indexlist[i] + 1, indexlist[i + 1] - 2))
+            text = "".join(file[indexlist[i] + 1 : indexlist[i + 1] - 2])
             st = Subtitle(id, st, et, text, ntype="srt")
             st.add_offset(offset=offset)
             subtitle_list.append(st)
             id += 1
         st, et = file[indexlist[-1]].split(" --> ")
         # id = int(file[indexlist[-1] - 1].strip().replace("\ufeff", ""))
-        text = "".join(file[x] for x in range(indexlist[-1] + 1, filelength))
+        text = "".join(file[indexlist[-1] + 1 :])
         st = Subtitle(id, st, et, text, ntype="srt")
         st.add_offset(offset=offset)
         subtitle_list.append(st)
@@ -194,7 +195,7 @@ def read_txt(filename):
     try:
         with open(filename, "r", encoding="utf-8") as f:
             text = f.read()
-        sentences = re.split(r"(?<=[!?。！？])(?=[^!?。！？（）()[\]【】'\"“”]|$)|\n|(?<=[.])(?=\s|$)", text)
+        sentences = TXT_SENTENCE_PATTERN.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
         subtitle_list = Subtitles()
         idx = 1
@@ -326,17 +327,24 @@ def create_multi_speaker(in_files, fps, offset, use_labled_text_mode, spk_dict):
     return getworklist(value=subtitle_list.dir), *load_page(subtitle_list), subtitle_list
 
 
-def remove_silence(audio, sr, padding_begin=0.1, padding_fin=0.15, threshold_db=-27):
+def silence_bounds(audio, sr, padding_begin=0.1, padding_fin=0.15, threshold_db=-27):
     # Padding(sec) is actually margin of safety
     hop_length = 512
     rms_list = get_rms(audio, hop_length=hop_length).squeeze(0)
     threshold = 10 ** (threshold_db / 20.0)
     x = rms_list > threshold
     i = np.argmax(x)
+    if not x[i]:  # argmax landed on a quiet frame, so nothing is loud: skip the reverse scan
+        return 0, audio.shape[-1]
     j = rms_list.shape[-1] - 1 - np.argmax(x[::-1])
-    if not np.any(x) or i==j:
-        return audio
+    if i == j:
+        return 0, audio.shape[-1]
     cutting_point1 = max(i * hop_length - int(padding_begin * sr), 0)
     cutting_point2 = min(j * hop_length + int(padding_fin * sr), audio.shape[-1])
     #print(audio.shape[-1],cutting_point1,cutting_point2)
+    return cutting_point1, cutting_point2
+
+
+def remove_silence(audio, sr, padding_begin=0.1, padding_fin=0.15, threshold_db=-27):
+    cutting_point1, cutting_point2 = silence_bounds(audio, sr, padding_begin, padding_fin, threshold_db)
     return audio[cutting_point1:cutting_point2]
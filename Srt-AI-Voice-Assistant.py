@@ -10,7 +10,6 @@ elif __file__:
     os.environ["exe"] = 'False'
 os.environ["current_path"] = current_path
 
-import shutil
 import gradio as gr
 import warnings
 
@@ -19,6 +18,7 @@ warnings.filterwarnings("ignore", category=UserWarning)
 import json
 import time
 import soundfile as sf
+import numpy as np
 import concurrent.futures
 from tqdm import tqdm
 from collections import defaultdict
@@ -48,6 +48,14 @@ COMPONENTS = {
 SETTINGS = Sava_Utils.settings.Settings_Manager(components=COMPONENTS)
 
 
+def longest_first(subtitles, workers):
+    # long lines dominate the tail of a parallel job, start them first so no worker is left with one at the end.
+    # a single worker has no tail to balance, keep the subtitle order and skip the sort.
+    if workers <= 1:
+        return subtitles
+    return sorted(subtitles, key=lambda x: len(x.text), reverse=True)
+
+
 # single speaker
 def generate(*args, interrupt_event: Sava_Utils.utils.Flag, proj="", in_files=[], fps=30, offset=0, max_workers=1):
     t1 = time.time()
@@ -59,24 +67,26 @@ def generate(*args, interrupt_event: Sava_Utils.utils.Flag, proj="", in_files=[]
         gr.Warning(i18n('The current mode does not allow batch processing!'))
         return (None, i18n('The current mode does not allow batch processing!'), getworklist(), *load_page(Subtitles()), Subtitles())
     os.makedirs(os.path.join(current_path, "SAVAdata", "output"), exist_ok=True)
-    for in_file in in_files:
-        try:
-            subtitle_list = read_file(in_file.name, fps, offset)
-        except Exception as e:
-            what = str(e)
-            gr.Warning(what)
-            return (None, what, getworklist(), *load_page(Subtitles()), Subtitles())
-        # subtitle_list.sort()
-        subtitle_list.set_dir_name(os.path.basename(in_file.name).replace(".", "-"))
-        subtitle_list.set_proj(proj)
-        TTS_Engine_dict[proj].before_gen_action(*args, config=Sava_Utils.config, notify=False, force=False)
-        abs_dir = subtitle_list.get_abs_dir()
-        if Sava_Utils.config.server_mode:
-            max_workers = 1
-        file_list = []
-        with interrupt_event:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(save, args, proj=proj, dir=abs_dir, subtitle=i) for i in subtitle_list]
+    if Sava_Utils.config.server_mode:
+        max_workers = 1
+    max_workers = max(1, positive_int(max_workers))
+    # one pool serves every input file of the batch instead of respawning threads per file.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for in_file in in_files:
+            try:
+                subtitle_list = read_file(in_file.name, fps, offset)
+            except Exception as e:
+                what = str(e)
+                gr.Warning(what)
+                return (None, what, getworklist(), *load_page(Subtitles()), Subtitles())
+            # subtitle_list.sort()
+            subtitle_list.set_dir_name(os.path.basename(in_file.name).replace(".", "-"))
+            subtitle_list.set_proj(proj)
+            TTS_Engine_dict[proj].before_gen_action(*args, config=Sava_Utils.config, notify=False, force=False)
+            abs_dir = subtitle_list.get_abs_dir()
+            file_list = []
+            with interrupt_event:
+                futures = [executor.submit(save, args, proj=proj, dir=abs_dir, subtitle=i) for i in longest_first(subtitle_list, max_workers)]
                 for future in tqdm(
                     concurrent.futures.as_completed(futures),
                     total=len(subtitle_list),
@@ -90,25 +100,25 @@ def generate(*args, interrupt_event: Sava_Utils.utils.Flag, proj="", in_files=[]
                     item = future.result()
                     if item:
                         file_list.append(item)
-            if interrupt_event.is_set():
-                sr_audio = None
-                break
-            if len(file_list) == 0:
-                # shutil.rmtree(abs_dir)
-                if len(in_files) == 1:
-                    error_msg = i18n('All subtitle syntheses have failed, please check the API service!')
-                    gr.Warning(error_msg)
-                    logger.error(error_msg)
-                    return (
-                        None,
-                        error_msg,
-                        getworklist(value=subtitle_list.dir),
-                        *load_page(subtitle_list),
-                        subtitle_list,
-                    )
-                else:
-                    continue
-        sr_audio = subtitle_list.audio_join(sr=Sava_Utils.config.output_sr)
+                if interrupt_event.is_set():
+                    sr_audio = None
+                    break
+                if len(file_list) == 0:
+                    # shutil.rmtree(abs_dir)
+                    if len(in_files) == 1:
+                        error_msg = i18n('All subtitle syntheses have failed, please check the API service!')
+                        gr.Warning(error_msg)
+                        logger.error(error_msg)
+                        return (
+                            None,
+                            error_msg,
+                            getworklist(value=subtitle_list.dir),
+                            *load_page(subtitle_list),
+                            subtitle_list,
+                        )
+                    else:
+                        continue
+            sr_audio = subtitle_list.audio_join(sr=Sava_Utils.config.output_sr)
     t2 = time.time()
     m, s = divmod(t2 - t1, 60)
     use_time = "%02d:%02d" % (m, s)
@@ -157,43 +167,44 @@ def gen_multispeaker(interrupt_event: Sava_Utils.utils.Flag, *args, remake=False
         return *show_page(page, subtitles), None
     ok = True
     progress = 0
-    for key in tasks.keys():
-        if key is None:
-            if subtitles.proj is None and subtitles.default_speaker is not None and len(tasks[None]) > 0:
-                print(f"{i18n('Using default speaker')}:{subtitles.default_speaker}")
-                spk = subtitles.default_speaker
-            elif subtitles.proj is not None and remake:
-                args = proj_args
-                project = subtitles.proj
-                spk = None
+    if Sava_Utils.config.server_mode:
+        max_workers = 1
+    # speakers are synthesized one after another, but they share one pool of request threads.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for key in tasks.keys():
+            if key is None:
+                if subtitles.proj is None and subtitles.default_speaker is not None and len(tasks[None]) > 0:
+                    print(f"{i18n('Using default speaker')}:{subtitles.default_speaker}")
+                    spk = subtitles.default_speaker
+                elif subtitles.proj is not None and remake:
+                    args = proj_args
+                    project = subtitles.proj
+                    spk = None
+                else:
+                    continue
             else:
-                continue
-        else:
-            spk = key
-        if spk is not None:
+                spk = key
+            if spk is not None:
+                try:
+                    with open(os.path.join(current_path, "SAVAdata", "speakers", spk), 'rb') as f:
+                        info = pickle.load(f)
+                except FileNotFoundError:
+                    ok = False
+                    logger.error(f"{i18n('Speaker archive not found')}: {spk}")
+                    gr.Warning(f"{i18n('Speaker archive not found')}: {spk}")
+                    continue
+                args = info["raw_data"]
+                project = info["project"]
             try:
-                with open(os.path.join(current_path, "SAVAdata", "speakers", spk), 'rb') as f:
-                    info = pickle.load(f)
-            except FileNotFoundError:
+                args = TTS_Engine_dict[project].arg_filter(*args)
+                TTS_Engine_dict[project].before_gen_action(*args, config=Sava_Utils.config, notify=False, force=False)
+            except Exception as e:
                 ok = False
-                logger.error(f"{i18n('Speaker archive not found')}: {spk}")
-                gr.Warning(f"{i18n('Speaker archive not found')}: {spk}")
+                gr.Warning(str(e))
                 continue
-            args = info["raw_data"]
-            project = info["project"]
-        try:
-            args = TTS_Engine_dict[project].arg_filter(*args)
-            TTS_Engine_dict[project].before_gen_action(*args, config=Sava_Utils.config)
-        except Exception as e:
-            ok = False
-            gr.Warning(str(e))
-            continue
-        if Sava_Utils.config.server_mode:
-            max_workers = 1
-        file_list = []
-        with interrupt_event:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(save, args, proj=project, dir=abs_dir, subtitle=i) for i in tasks[key]]
+            file_list = []
+            with interrupt_event:
+                futures = [executor.submit(save, args, proj=project, dir=abs_dir, subtitle=i) for i in longest_first(tasks[key], max_workers)]
                 for future in tqdm(
                     concurrent.futures.as_completed(futures),
                     total=len(todo),
@@ -210,10 +221,10 @@ def gen_multispeaker(interrupt_event: Sava_Utils.utils.Flag, *args, remake=False
                         file_list.append(item)
                 if interrupt_event.is_set():
                     break
-        progress += len(file_list)
-        if len(file_list) == 0:
-            ok = False
-            gr.Warning(f"{i18n('Synthesis for the single speaker has failed !')} {spk}")
+            progress += len(file_list)
+            if len(file_list) == 0:
+                ok = False
+                gr.Warning(f"{i18n('Synthesis for the single speaker has failed !')} {spk}")
 
     gr.Info(i18n('Done!'))
     if remake:
@@ -229,39 +240,58 @@ def gen_multispeaker(interrupt_event: Sava_Utils.utils.Flag, *args, remake=False
 def save(args, proj: str = None, dir: str = None, subtitle: Subtitle = None):
     audio = TTS_Engine_dict[proj].save_action(*args, text=subtitle.text)
     if audio is not None:
-        if audio[:4] == b'RIFF' and audio[8:12] == b'WAVE':
+        if audio.startswith(b'RIFF') and audio.startswith(b'WAVE', 8):
             # sr=int.from_bytes(audio[24:28],'little')
             filepath = os.path.join(dir, f"{subtitle.index}.wav")
+            decoded = False
             if Sava_Utils.config.remove_silence:
-                audio, sr = Sava_Utils.audio_utils.load_audio(io.BytesIO(audio))
-                audio = remove_silence(audio, sr)
-                sf.write(filepath, audio, sr)
+                pcm = Sava_Utils.audio_utils.read_pcm16_mono(audio)
+                if pcm is not None:  # the usual TTS output: cut the 16-bit samples as they are, no float decode and re-encode
+                    samples, sr = pcm
+                    cutting_point1, cutting_point2 = silence_bounds(np.multiply(samples, 1 / 32768, dtype=np.float32), sr)
+                    audio = samples[cutting_point1:cutting_point2]
+                    with open(filepath, 'wb') as file:
+                        file.write(Sava_Utils.audio_utils.pcm16_to_wav(audio.tobytes(), sr))
+                else:
+                    audio, sr = Sava_Utils.audio_utils.load_audio(io.BytesIO(audio))
+                    audio = remove_silence(audio, sr)
+                    sf.write(filepath, audio, sr)
+                decoded = True
             else:
                 with open(filepath, 'wb') as file:
                     file.write(audio)
             if Sava_Utils.config.max_accelerate_ratio > 1.0 or Sava_Utils.config.min_slowdown_ratio < 1.0:  # enabled
-                audio, sr = Sava_Utils.audio_utils.load_audio(filepath)
+                if decoded:  # the trimmed array is what we just wrote, no need to decode the file again
+                    n_frames = audio.shape[-1]
+                else:  # only the length is needed, the wav header has it
+                    info = sf.info(filepath)
+                    n_frames, sr = info.frames, info.samplerate
                 target_dur = int(subtitle.end_time - subtitle.start_time) * sr
                 if target_dur > (0.01 * sr):
-                    if Sava_Utils.config.max_accelerate_ratio > 1.0 and (audio.shape[-1] - target_dur) > (0.01 * sr):  # accelerate
-                        ratio = min(audio.shape[-1] / target_dur, Sava_Utils.config.max_accelerate_ratio)
-                    elif Sava_Utils.config.min_slowdown_ratio < 1.0 and (target_dur - audio.shape[-1]) > (0.01 * sr):  # slowdown
-                        ratio = max(audio.shape[-1] / target_dur, Sava_Utils.config.min_slowdown_ratio)
+                    if Sava_Utils.config.max_accelerate_ratio > 1.0 and (n_frames - target_dur) > (0.01 * sr):  # accelerate
+                        ratio = min(n_frames / target_dur, Sava_Utils.config.max_accelerate_ratio)
+                    elif Sava_Utils.config.min_slowdown_ratio < 1.0 and (target_dur - n_frames) > (0.01 * sr):  # slowdown
+                        ratio = max(n_frames / target_dur, Sava_Utils.config.min_slowdown_ratio)
                     else:
                         ratio = None
+                    if ratio is not None and round(ratio, 2) == 1.0:  # atempo=1.00 would only spawn ffmpeg to rewrite the same audio
+                        ratio = None
                     if ratio is not None:
                         cmd = f'ffmpeg -i "{filepath}" -filter:a atempo={ratio:.2f} -y "{filepath}.wav"'
                         p = subprocess.Popen(cmd, cwd=current_path, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                        logger.info(f"{i18n('Execute command')}:{cmd}")
+                        logger.info("%s:%s", i18n('Execute command'), cmd)  # formatted only when INFO is enabled
                         exit_code = p.wait()
-                        if os.path.isfile(f"{filepath}.wav"):
-                            shutil.move(f"{filepath}.wav", filepath)
-                        else:
+                        try:
+                            os.replace(f"{filepath}.wav", filepath)
+                        except FileNotFoundError:
                             logger.error("Failed to execute ffmpeg.")
             subtitle.is_success = True
             return filepath
         else:
-            data = json.loads(audio)
+            try:
+                data = json.loads(audio)
+            except ValueError:
+                data = audio[:200]  # neither wav nor json, do not let one bad response abort the whole job
             logger.error(f"{i18n('Failed subtitle id')}:{subtitle.index},{i18n('error message received')}:{str(data)}")
             subtitle.is_success = False
             return None
@@ -459,7 +489,7 @@ if __name__ == "__main__":
                                     __ = gr.Button(value="▶️", scale=1, min_width=50)
                                     __.click(play_audio, inputs=[edit_real_index, STATE], outputs=[audio_player])
                                     edit_rows += TTS_UI_LOADER.get_regenbtn([page_slider, edit_real_index, edit_start_end_time, s_txt, STATE], [audio_player, page_slider] + edit_rows[-6:], remake)
-                        workrefbtn.click(getworklist, inputs=[], outputs=[worklist])
+                        workrefbtn.click(lambda: getworklist(refresh=True), inputs=[], outputs=[worklist])
                         export_btn.click(lambda file_list, x: ([i.name for i in file_list] if file_list else []) + ([o] if (o := x.export()) else []), inputs=[input_file, STATE], outputs=[input_file])
                         with gr.Row(equal_height=True):
                             all_selection_btn = gr.Button(value=i18n('Select All'), interactive=True, min_width=50)
@@ -501,7 +531,7 @@ if __name__ == "__main__":
                         tts_projet_namelist = list(TTS_UI_LOADER.project_dict.keys())
                         select_spk_projet = gr.Dropdown(choices=tts_projet_namelist, value=tts_projet_namelist[0], interactive=True, label=i18n('TTS Project'))
                         refresh_spk_list_btn = gr.Button(value="🔄️", min_width=60, scale=0)
-                        refresh_spk_list_btn.click(getspklist, inputs=[], outputs=[speaker_list])
+                        refresh_spk_list_btn.click(lambda: getspklist(refresh=True), inputs=[], outputs=[speaker_list])
                         apply_btn = gr.Button(value="✅", min_width=60, scale=0)
                         apply_btn.click(apply_spk, inputs=[speaker_list, page_slider, STATE, *edit_check_list, *edit_real_index_list], outputs=[*edit_check_list, *edit_rows])
 
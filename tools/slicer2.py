@@ -2,6 +2,7 @@ import numpy as np
 
 
 # This function is obtained from librosa.
+# Kept in sync with Sava_Utils.audio_utils.get_rms, this script runs under the GSV interpreter where Sava_Utils is not importable.
 def get_rms(
     y,
     frame_length=2048,
@@ -10,29 +11,13 @@ def get_rms(
 ):
     padding = (int(frame_length // 2), int(frame_length // 2))
     y = np.pad(y, padding, mode=pad_mode)
+    # running sum of squares, the power of a frame is the difference of two entries.
+    cumsum = np.cumsum(np.square(y, dtype=np.float64), axis=-1)
+    cumsum = np.concatenate([np.zeros(cumsum.shape[:-1] + (1,)), cumsum], axis=-1)
+    starts = np.arange(0, y.shape[-1] - frame_length + 1, hop_length)
+    power = (cumsum[..., starts + frame_length] - cumsum[..., starts]) / frame_length
 
-    axis = -1
-    # put our new within-frame axis at the end for now
-    out_strides = y.strides + tuple([y.strides[axis]])
-    # Reduce the shape on the framing axis
-    x_shape_trimmed = list(y.shape)
-    x_shape_trimmed[axis] -= frame_length - 1
-    out_shape = tuple(x_shape_trimmed) + tuple([frame_length])
-    xw = np.lib.stride_tricks.as_strided(y, shape=out_shape, strides=out_strides)
-    if axis < 0:
-        target_axis = axis - 1
-    else:
-        target_axis = axis + 1
-    xw = np.moveaxis(xw, -1, target_axis)
-    # Downsample along the target axis
-    slices = [slice(None)] * xw.ndim
-    slices[axis] = slice(0, None, hop_length)
-    x = xw[tuple(slices)]
-
-    # Calculate power
-    power = np.mean(np.abs(x) ** 2, axis=-2, keepdims=True)
-
-    return np.sqrt(power)
+    return np.sqrt(power)[..., np.newaxis, :]
 
 
 class Slicer:
@@ -85,9 +70,11 @@ class Slicer:
         sil_tags = []
         silence_start = None
         clip_start = 0
-        for i, rms in enumerate(rms_list):
+        # threshold every frame at once, the loop then walks plain python bools instead of numpy scalars
+        silent = (rms_list < self.threshold).tolist()
+        for i, is_silent in enumerate(silent):
             # Keep looping while frame is silent.
-            if rms < self.threshold:
+            if is_silent:
                 # Record start of silent frames.
                 if silence_start is None:
                     silence_start = i
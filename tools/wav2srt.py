@@ -44,7 +44,9 @@ def init_ASRmodels():
 
         model_path = f'tools/asr/models/faster-whisper-{args.whisper_size}'
         os.makedirs(model_path, exist_ok=True)
-        if os.listdir(model_path) == []:
+        with os.scandir(model_path) as it:  # one entry is enough to know the model is there, no full listing
+            model_missing = next(it, None) is None
+        if model_missing:
             print("Downloading faster whisper model...")
             os.makedirs(model_path, exist_ok=True)
             faster_whisper.download_model(size_or_id=args.whisper_size, output_dir=model_path)
@@ -81,7 +83,8 @@ def init_ASRmodels():
 
 def whisper_transcribe(audio, sr):
     global model
-    audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
+    if sr != 16000:
+        audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
     # lang = ['zh', 'ja', 'en']
     try:
         segments, info = model.transcribe(audio=audio.astype(np.float32), beam_size=5, vad_filter=False, language=None)
@@ -96,14 +99,16 @@ def whisper_transcribe(audio, sr):
 
 def funasr_transcribe(audio, sr):
     global model
-    audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
+    if sr != 16000:
+        audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
     text = model.generate(input=audio)[0]["text"]
     return text
 
 
 def transcribe(wav_paths, save_root):
     for audio_path in tqdm(wav_paths, desc='Transcribing...'):
-        audio, sr = librosa.load(audio_path, sr=None)
+        # decode straight to the 16k the ASR models want, so the chunks need no resampling one by one
+        audio, sr = librosa.load(audio_path, sr=16000)
         slicer = Slicer(
             sr=sr,
             threshold=int(args.threshold),  # 音量小于这个值视作静音的备选切割点